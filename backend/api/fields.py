@@ -0,0 +1,74 @@
+from django.core.files.storage import default_storage
+from django.utils.encoding import filepath_to_uri
+from django.utils.functional import cached_property
+from rest_framework.fields import ImageField
+from rest_framework.relations import (MANY_RELATION_KWARGS, ManyRelatedField,
+                                      PrimaryKeyRelatedField)
+
+
+def build_media_url(request):
+    """Абсолютный адрес каталога медиа для запроса."""
+    if request is None:
+        return default_storage.base_url
+    return request.build_absolute_uri(default_storage.base_url)
+
+
+def media_file_url(media_url, file):
+    """Ссылка на файл от готового префикса, без обращения к хранилищу."""
+    if not file:
+        return None
+    return media_url + filepath_to_uri(file.name).lstrip("/")
+
+
+class BulkManyRelatedField(ManyRelatedField):
+    """Список связанных объектов, загружаемый одним запросом."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        return self.child_relation.get_many(data)
+
+
+class BulkPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """Первичные ключи, которые при many=True проверяются через in_bulk."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def get_many(self, data):
+        """Объекты по списку первичных ключей в порядке их передачи."""
+        if self.pk_field is not None:
+            data = [self.pk_field.to_internal_value(pk) for pk in data]
+        for pk in data:
+            if isinstance(pk, bool):
+                self.fail("incorrect_type", data_type=type(pk).__name__)
+        try:
+            objects = self.get_queryset().in_bulk(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data[0]).__name__)
+        for pk in data:
+            if pk not in objects:
+                self.fail("does_not_exist", pk_value=pk)
+        return [objects[pk] for pk in data]
+
+
+class MediaImageField(ImageField):
+    """Изображение со ссылкой от общего префикса хранилища.
+
+    Абсолютный адрес каталога медиа строится один раз на поле,
+    дальше к нему дописывается имя файла.
+    """
+
+    @cached_property
+    def media_url(self):
+        return build_media_url(self.context.get("request"))
+
+    def to_representation(self, value):
+        return media_file_url(self.media_url, value)
@@ -1,7 +1,47 @@
-from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import Paginator
+from django.db import OperationalError, connection, transaction
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+COUNT_TIMEOUT_MS = 200
+COUNT_FALLBACK = 9_999_999_999
+
+
+class TimeLimitedPaginator(Paginator):
+    """Пагинатор с ограничением времени на подсчет количества объектов.
+
+    На PostgreSQL COUNT(*) выполняется с `statement_timeout`; если запрос
+    не уложился, вместо точного значения возвращается COUNT_FALLBACK.
+    """
+
+    @cached_property
+    def count(self):
+        if connection.vendor != "postgresql":
+            return super().count
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    "SET LOCAL statement_timeout TO %s", [COUNT_TIMEOUT_MS]
+                )
+                return super().count
+        except OperationalError:
+            return COUNT_FALLBACK
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     """Пагинатор."""
 
+    django_paginator_class = TimeLimitedPaginator
     page_size_query_param = "limit"
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset-пагинатор рецептов: WHERE id < курсор вместо OFFSET."""
+
+    ordering = "-id"
+    page_size = 6
+    page_size_query_param = "limit"
+
+
+class SubscriptionCursorPagination(RecipeCursorPagination):
+    """Keyset-пагинатор подписок."""
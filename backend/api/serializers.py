@@ -1,18 +1,64 @@
-import re
+from copy import copy, deepcopy
 
+from django.utils.functional import cached_property
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework.fields import BooleanField, IntegerField
-from rest_framework.serializers import (ModelSerializer,
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import (BaseSerializer, ListSerializer,
+                                        ModelSerializer,
                                         PrimaryKeyRelatedField,
                                         SerializerMethodField,
                                         StringRelatedField, ValidationError)
 
+from api.fields import (BulkPrimaryKeyRelatedField, MediaImageField,
+                        build_media_url, media_file_url)
 from recipes.models import Ingredient, Recipe, RecipeIngredients, Tag
-from users.models import User
+from users.models import Subscription, User
 
 
-class CustomUserCreateSerializer(UserCreateSerializer):
+class CachedFieldsSerializerMixin:
+    """Кеширование полей сериализатора на уровне класса.
+
+    Поля строятся один раз на класс, каждому экземпляру достаются копии.
+    Вложенные сериализаторы копируются глубоко, чтобы их дочерние поля
+    были привязаны к новому родителю и видели его контекст.
+    """
+
+    _field_cache = {}
+
+    def get_fields(self):
+        cls = type(self)
+        if cls not in self._field_cache:
+            self._field_cache[cls] = super().get_fields()
+        return {
+            name: (
+                deepcopy(field)
+                if isinstance(field, (BaseSerializer, ManyRelatedField))
+                else copy(field)
+            )
+            for name, field in self._field_cache[cls].items()
+        }
+
+
+class CaseInsensitiveEmailMixin:
+    """Email в нижнем регистре, уникальный без учета регистра."""
+
+    def validate_email(self, value):
+        value = value.lower()
+        users = User.objects.filter(email__iexact=value)
+        if self.instance is not None:
+            users = users.exclude(pk=self.instance.pk)
+        if users.exists():
+            raise ValidationError(
+                "Пользователь с таким адресом электронной почты "
+                "уже существует."
+            )
+        return value
+
+
+class CustomUserCreateSerializer(CaseInsensitiveEmailMixin,
+                                 UserCreateSerializer):
     """Сериализатор регистрации пользователей."""
 
     class Meta:
@@ -27,17 +73,6 @@ class CustomUserCreateSerializer(UserCreateSerializer):
 
         )
 
-    def validate_username(self, value):
-        if value.lower() == "me":
-            raise ValidationError('Имя пользователя "me" недопустимо.')
-
-        if not re.match(r"^[\w.@+-]+$", value):
-            raise ValidationError(
-                "Имя пользователя должно содержать только буквы, цифры "
-                "и следующие символы: @, ., +, -, _."
-            )
-        return value
-
 
 class BaseUserSerializer(UserSerializer):
     """Сериализатор базовый."""
@@ -55,22 +90,34 @@ class BaseUserSerializer(UserSerializer):
             "is_subscribed",
         )
 
-    def get_is_subscribed(self, obj):
-        """Проверка подписки на просматриваемого пользователя."""
+    @cached_property
+    def auth_user(self):
+        """Авторизованный пользователь запроса, вычисляется один раз."""
         request = self.context.get("request")
         if not request or request.user.is_anonymous:
+            return None
+        return request.user
+
+    def get_is_subscribed(self, obj):
+        """Проверка подписки на просматриваемого пользователя."""
+        if hasattr(obj, "is_subscribed"):
+            return obj.is_subscribed
+        user = self.auth_user
+        if user is None or obj.pk == user.pk:
             return False
-        return obj.following.filter(user=request.user).exists()
+        if hasattr(obj, "request_user_subscriptions"):
+            return bool(obj.request_user_subscriptions)
+        return Subscription.objects.is_following(user.pk, obj.pk)
 
 
-class CustomUserSerializer(BaseUserSerializer):
+class CustomUserSerializer(CaseInsensitiveEmailMixin, BaseUserSerializer):
     """Сериализатор информации о пользователе."""
 
     def create(self, validated_data):
         return User.objects.create_user(**validated_data)
 
 
-class SubscriptionSerializer(BaseUserSerializer):
+class SubscriptionSerializer(CachedFieldsSerializerMixin, BaseUserSerializer):
     """Сериализатор подписки на других авторов."""
 
     recipes_count = IntegerField()
@@ -91,15 +138,23 @@ class SubscriptionSerializer(BaseUserSerializer):
 
     def get_recipes(self, obj):
         """Список рецептов в подписке."""
-        recipes_limit = self.context["request"].GET.get("recipes_limit")
+        request = self.context["request"]
+        recipes_limit = request.GET.get("recipes_limit")
         if recipes_limit:
             recipes = obj.recipes.all()[:int(recipes_limit)]
         else:
             recipes = obj.recipes.all()
-        return RecipeListSerializer(recipes, many=True, read_only=True).data
+        return [
+            serialize_recipe_list(recipe, self.media_url) for recipe in recipes
+        ]
 
+    @cached_property
+    def media_url(self):
+        """Префикс ссылок на изображения, общий для всего ответа."""
+        return build_media_url(self.context.get("request"))
 
-class TagSerializer(ModelSerializer):
+
+class TagSerializer(CachedFieldsSerializerMixin, ModelSerializer):
     """Сериализатор тега."""
 
     class Meta:
@@ -107,7 +162,7 @@ class TagSerializer(ModelSerializer):
         fields = ("id", "name", "color", "slug")
 
 
-class IngredientSerializer(ModelSerializer):
+class IngredientSerializer(CachedFieldsSerializerMixin, ModelSerializer):
     """Сериализатор ингридиента."""
 
     class Meta:
@@ -129,26 +184,46 @@ class RecipeIngredientSerializer(ModelSerializer):
         fields = ("id", "name", "measurement_unit", "amount")
 
 
+class RecipeIngredientListSerializer(ListSerializer):
+    """Список ингредиентов рецепта, загружаемых одним запросом in_bulk."""
+
+    def to_internal_value(self, data):
+        items = super().to_internal_value(data)
+        ingredients = Ingredient.objects.in_bulk(
+            [item["id"] for item in items]
+        )
+        for item in items:
+            if item["id"] not in ingredients:
+                raise ValidationError(
+                    f"Недопустимый первичный ключ \"{item['id']}\" - "
+                    "объект не существует."
+                )
+            item["id"] = ingredients[item["id"]]
+        return items
+
+
 class RecipeIngredientCreateSerializer(ModelSerializer):
     """Сериализатор состава ингридиентов в создаваемом рецепте."""
 
-    id = PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = IntegerField()
 
     class Meta:
         model = RecipeIngredients
         fields = ("id", "amount")
+        list_serializer_class = RecipeIngredientListSerializer
 
 
-class RecipeListSerializer(ModelSerializer):
-    """Сериализатор рецепта, для связки рецепта и пользователя."""
-
-    class Meta:
-        model = Recipe
-        fields = ("id", "name", "image", "cooking_time")
-        read_only_fields = ("__all__",)
+def serialize_recipe_list(recipe, media_url):
+    """Краткое представление рецепта, для связки рецепта и пользователя."""
+    return {
+        "id": recipe.id,
+        "name": recipe.name,
+        "image": media_file_url(media_url, recipe.image),
+        "cooking_time": recipe.cooking_time,
+    }
 
 
-class RecipeSerializer(ModelSerializer):
+class RecipeSerializer(CachedFieldsSerializerMixin, ModelSerializer):
     """Сериализатор рецепта."""
 
     tags = TagSerializer(many=True)
@@ -158,12 +233,7 @@ class RecipeSerializer(ModelSerializer):
     )
     is_favorited = BooleanField(default=False)
     is_in_shopping_cart = BooleanField(default=False)
-    image = SerializerMethodField()
-
-    def get_image(self, obj):
-        if obj.image:
-            return obj.image.url
-        return None
+    image = MediaImageField(read_only=True)
 
     class Meta:
         model = Recipe
@@ -188,7 +258,9 @@ class RecipeCreateSerializer(ModelSerializer):
     ingredients = RecipeIngredientCreateSerializer(
         many=True
     )
-    tags = PrimaryKeyRelatedField(many=True, queryset=Tag.objects.all())
+    tags = BulkPrimaryKeyRelatedField(
+        many=True, queryset=Tag.objects.all(), pk_field=IntegerField()
+    )
 
     class Meta:
         model = Recipe
@@ -214,21 +286,16 @@ class RecipeCreateSerializer(ModelSerializer):
                 raise ValidationError(f"Не заполнено поле `{field}`")
 
         ingredients = initial_data.get("ingredients")
-        ingredients_set = set()
-        for ingredient in ingredients:
-            amount = int(ingredient.get("amount"))
-            ingredient_id = ingredient.get("id")
-            if not amount or not ingredient_id:
-                raise ValidationError(
-                    "Указать `amount` и `id` для ингредиента."
-                )
-            if not amount > 0:
-                raise ValidationError("Количество ингредиента"
-                                      "не может быть меньше 1.")
-            if ingredient_id in ingredients_set:
-                raise ValidationError("Необходимо исключить"
-                                      "повторяющиеся ингредиенты.")
-            ingredients_set.add(ingredient_id)
+        ids = [ingredient.get("id") for ingredient in ingredients]
+        amounts = [ingredient.get("amount") for ingredient in ingredients]
+        if not all(ids) or not all(amounts):
+            raise ValidationError("Указать `amount` и `id` для ингредиента.")
+        if not all(int(amount) > 0 for amount in amounts):
+            raise ValidationError("Количество ингредиента "
+                                  "не может быть меньше 1.")
+        if len(ids) != len(set(ids)):
+            raise ValidationError("Необходимо исключить "
+                                  "повторяющиеся ингредиенты.")
         return data
 
     def create(self, validated_data):
@@ -245,7 +312,6 @@ class RecipeCreateSerializer(ModelSerializer):
         """Обновляет рецепт, обновляя связанные теги и ингредиенты."""
         tags = validated_data.pop("tags")
         ingredients = validated_data.pop("ingredients")
-        instance.tags.clear()
         instance.tags.set(tags)
         RecipeIngredients.objects.filter(recipe=instance).delete()
         self.create_recipe_ingredient(instance, ingredients)
@@ -253,13 +319,4 @@ class RecipeCreateSerializer(ModelSerializer):
 
     def create_recipe_ingredient(self, recipe, ingredients):
         """Создает связи между рецептом и ингредиентами."""
-        recipe_ingredients = []
-        for ingredient in ingredients:
-            recipe_ingredient = RecipeIngredients(
-                recipe=recipe,
-                ingredient=ingredient["id"],
-                amount=ingredient["amount"]
-            )
-            recipe_ingredients.append(recipe_ingredient)
-
-        RecipeIngredients.objects.bulk_create(recipe_ingredients)
+        RecipeIngredients.bulk_create_for(recipe, ingredients)
@@ -1,6 +1,12 @@
-from django.db.models import BooleanField, Case, Count, Value, When
-from django.http import HttpResponse
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import (BooleanField, Count, Exists, IntegerField,
+                              OuterRef, Prefetch, Subquery, Sum, Value)
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_page
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from rest_framework import status
@@ -11,29 +17,70 @@ from rest_framework.permissions import (IsAuthenticated,
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
+from api.fields import build_media_url
 from api.filters import IngredientFilter, RecipeFilter
-from api.paginator import CustomPageNumberPagination
+from api.paginator import (CustomPageNumberPagination, RecipeCursorPagination,
+                           SubscriptionCursorPagination)
 from api.permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly
 from api.serializers import (IngredientSerializer, RecipeCreateSerializer,
-                             RecipeListSerializer, RecipeSerializer,
-                             SubscriptionSerializer, TagSerializer)
+                             RecipeSerializer, SubscriptionSerializer,
+                             TagSerializer, serialize_recipe_list)
 from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredients,
                             ShoppingCart, Tag)
 from users.models import Subscription, User
 
 
+RECIPES_COUNT = Coalesce(
+    Subquery(
+        Recipe.objects.filter(author=OuterRef("pk"))
+        .order_by()
+        .values("author")
+        .annotate(count=Count("*"))
+        .values("count"),
+        output_field=IntegerField(),
+    ),
+    0,
+)
+SUBSCRIPTION_RECIPES = Prefetch(
+    "recipes",
+    queryset=Recipe.objects.only(
+        "id", "name", "image", "cooking_time", "author_id"
+    ),
+)
+
+
 class CustomUserViewSet(UserViewSet):
     """Viewset пользователя."""
 
-    queryset = User.objects.all()
+    queryset = User.objects.order_by("id")
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            return queryset.annotate(
+                is_subscribed=Exists(
+                    Subscription.objects.filter(
+                        user=user, author=OuterRef("pk")
+                    )
+                )
+            )
+        return queryset
+
     @action(detail=False, permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
         """Список пользователей на которого подписан текущий пользователь."""
         queryset = User.objects.filter(following__user=request.user).annotate(
-            recipes_count=Count("recipes"))
-        paginator = CustomPageNumberPagination()
+            recipes_count=RECIPES_COUNT,
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).prefetch_related(SUBSCRIPTION_RECIPES).order_by("id")
+        paginator = (
+            SubscriptionCursorPagination()
+            if SubscriptionCursorPagination.cursor_query_param
+            in request.query_params
+            else CustomPageNumberPagination()
+        )
         paginated_queryset = paginator.paginate_queryset(queryset, request)
         serializer = SubscriptionSerializer(
             paginated_queryset,
@@ -53,24 +100,27 @@ class CustomUserViewSet(UserViewSet):
     )
     def subscribe(self, request, id):
         user = self.request.user
-        author = get_object_or_404(User.objects.annotate(
-            recipes_count=Count("recipes")), pk=id)
+        author = get_object_or_404(User, pk=id)
         if author == user:
             return Response(
                 {"errors": "Вы не можете подписаться на себя."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        instance, created = Subscription.objects.get_or_create(
-            user=user, author=author
-        )
-        if not created and instance:
+        try:
+            with transaction.atomic():
+                Subscription.objects.create(user=user, author=author)
+        except IntegrityError:
             return Response(
                 {"errors": "Вы уже были подписаны прежде"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        author = User.objects.annotate(
+            recipes_count=RECIPES_COUNT,
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).prefetch_related(SUBSCRIPTION_RECIPES).get(pk=author.pk)
         serializer = SubscriptionSerializer(
-            instance.author, context={"request": request}
+            author, context={"request": request}
         )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -78,18 +128,23 @@ class CustomUserViewSet(UserViewSet):
     def delete_subscribe(self, request, id):
         user = self.request.user
         author = get_object_or_404(User, pk=id)
-        subscription = Subscription.objects.filter(
+        deleted, _ = Subscription.objects.filter(
             user=user,
-            author=author)
-        if not subscription.exists():
+            author=author).delete()
+        if not deleted:
             return Response(
                 {"errors": "Вы не были подписаны"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        subscription.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+reference_cache = cache_page(settings.REFERENCE_CACHE_TIMEOUT,
+                             cache="reference")
+
+
+@method_decorator(reference_cache, name="list")
+@method_decorator(reference_cache, name="retrieve")
 class TagViewSet(ReadOnlyModelViewSet):
     """Viewset тега."""
 
@@ -98,6 +153,8 @@ class TagViewSet(ReadOnlyModelViewSet):
     permission_classes = (IsAdminOrReadOnly,)
 
 
+@method_decorator(reference_cache, name="list")
+@method_decorator(reference_cache, name="retrieve")
 class IngredientViewSet(ReadOnlyModelViewSet):
     """Viewset ингредиента."""
 
@@ -120,48 +177,80 @@ class RecipeViewSet(ModelViewSet):
         user_obj = self.request.user
         queryset = Recipe.objects.select_related(
             "author"
-        ).prefetch_related("tags",
-                           "ingredients"
-                           )
+        ).prefetch_related(
+            "tags",
+            Prefetch(
+                "recipeingredients",
+                queryset=RecipeIngredients.objects.select_related(
+                    "ingredient"
+                ),
+            ),
+        )
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.only(
+                "id",
+                "name",
+                "image",
+                "text",
+                "cooking_time",
+                "author__id",
+                "author__email",
+                "author__username",
+                "author__first_name",
+                "author__last_name",
+            )
         if user_obj.is_authenticated:
-            return queryset.annotate(
-                is_favorited=Case(
-                    When(favorite__user=user_obj,
-                         then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
-                ), is_in_shopping_cart=Case(
-                    When(shoppingcart__user=user_obj,
-                         then=Value(True)),
-                    default=Value(False),
-                    output_field=BooleanField(),
+            return queryset.prefetch_related(
+                Prefetch(
+                    "author__following",
+                    queryset=Subscription.objects.filter(
+                        user=user_obj
+                    ).select_related(None),
+                    to_attr="request_user_subscriptions",
+                )
+            ).annotate(
+                is_favorited=Exists(
+                    Favorite.objects.filter(
+                        user=user_obj, recipe=OuterRef("pk")
+                    )
+                ),
+                is_in_shopping_cart=Exists(
+                    ShoppingCart.objects.filter(
+                        user=user_obj, recipe=OuterRef("pk")
+                    )
                 ),
             )
-        return queryset
+        return queryset.annotate(
+            is_favorited=Value(False, output_field=BooleanField()),
+            is_in_shopping_cart=Value(False, output_field=BooleanField()),
+        )
+
+    @property
+    def paginator(self):
+        """Keyset-пагинация, если клиент передал параметр `cursor`."""
+        if not hasattr(self, "_paginator"):
+            cursor_param = RecipeCursorPagination.cursor_query_param
+            self._paginator = (
+                RecipeCursorPagination()
+                if cursor_param in self.request.query_params
+                else self.pagination_class()
+            )
+        return self._paginator
 
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
             return RecipeSerializer
         return RecipeCreateSerializer
 
-    def handle_action(self, request, pk, model_class):
-        if request.method == "POST":
-            data, status = self.create_recipe_user(request, pk, model_class)
-        else:
-            data, status = self.delete_recipe_user(request, pk, model_class)
-        return data, status
-
     @action(methods=["post", "delete"], detail=True)
     def favorite(self, request, pk):
         """Действия с избранным: добавляем/удаляем рецепт."""
-        data, status = self.handle_action(request, pk, Favorite)
-        return Response(data, status=status)
+        return self.toggle_recipe_user(request, pk, Favorite)
 
     @action(methods=["post", "delete"], detail=True)
     def shopping_cart(self, request, pk):
         """Действия с корзиной: добавляем/удаляем рецепт."""
-        data, status = self.handle_action(request, pk, ShoppingCart)
-        return Response(data, status=status)
+        return self.toggle_recipe_user(request, pk, ShoppingCart)
 
     @action(methods=["get"], detail=False,
             permission_classes=[IsAuthenticated])
@@ -169,52 +258,49 @@ class RecipeViewSet(ModelViewSet):
         """Выгружаем список продуктов из корзины (формат txt)."""
         ingredients = RecipeIngredients.objects.filter(
             recipe__shoppingcart__user=request.user
-        ).values_list(
+        ).values(
             "ingredient__name",
             "ingredient__measurement_unit",
-            "amount"
+        ).annotate(
+            total=Sum("amount")
+        ).order_by("ingredient__name")
+
+        def shopping_list():
+            yield "Список покупок:\n"
+            for i, item in enumerate(ingredients.iterator(chunk_size=1000), 1):
+                yield (f"{i}. {item['ingredient__name'].capitalize()}: "
+                       f"{item['total']} "
+                       f"{item['ingredient__measurement_unit']}\n")
+
+        response = StreamingHttpResponse(
+            shopping_list(), content_type="text/plain"
         )
-        shopping_result = {}
-        for item in ingredients:
-            name, measurement_unit, amount = item
-            if name not in shopping_result:
-                shopping_result[name] = {
-                    "measurement_unit": measurement_unit,
-                    "amount": amount,
-                }
-            else:
-                shopping_result[name]["amount"] += amount
-        output = ""
-        for i, (name, data) in enumerate(shopping_result.items(), 1):
-            output += (f"{i}. {name.capitalize()}: "
-                       f"{data['amount']} {data['measurement_unit']}\n")
-        response = HttpResponse(output, content_type="text/plain")
         response["Content-Disposition"] = "attachment; filename={0}".format(
             "Список_покупок.txt"
         )
         return response
 
-    def create_recipe_user(self, request, pk, model):
-        """Создание связи между рецептом и пользователем по id рецепта."""
-        recipe = get_object_or_404(Recipe, id=pk)
-        object_got, created = model.objects.get_or_create(recipe=recipe,
-                                                          user=request.user)
-        if not created:
-            return (
-                {"message": f"Уже есть рецепт с id = {pk}."},
-                status.HTTP_400_BAD_REQUEST,
-            )
-        serializer = RecipeListSerializer(recipe,
-                                          context={"request": request})
-        return serializer.data, status.HTTP_201_CREATED
-
-    def delete_recipe_user(self, request, pk, model):
-        """Удаление связи рецепта и пользователем по id."""
-        recipe = get_object_or_404(Recipe, id=pk)
-
-        model_obj = get_object_or_404(model,
-                                      user=request.user,
-                                      recipe=recipe)
+    def toggle_recipe_user(self, request, pk, model):
+        """Создание (POST) или удаление связи рецепта и пользователя."""
+        if request.method == "POST":
+            recipe = get_object_or_404(Recipe, id=pk)
+            try:
+                with transaction.atomic():
+                    model.objects.create(recipe=recipe, user=request.user)
+            except IntegrityError:
+                return Response(
+                    {"message": f"Уже есть рецепт с id = {pk}."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return Response(serialize_recipe_list(recipe,
+                                                  build_media_url(request)),
+                            status=status.HTTP_201_CREATED)
 
-        model_obj.delete()
-        return None, status.HTTP_204_NO_CONTENT
+        deleted, _ = model.objects.filter(user=request.user,
+                                          recipe_id=pk).delete()
+        if not deleted:
+            return Response(
+                {"message": f"Рецепт с id = {pk} не найден."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -67,9 +67,20 @@ DATABASES = {
         "PASSWORD": env("POSTGRES_PASSWORD", ""),
         "HOST": env("DB_HOST", ""),
         "PORT": env("DB_PORT", "5432"),
+        "CONN_MAX_AGE": env.int("CONN_MAX_AGE", 60),
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "reference": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "reference",
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -132,3 +143,5 @@ MAX_LENGTH_NAME = 200
 MAX_LENGTH_HEX = 7
 MAX_LENGTH_EMAIL = 254
 MAX_LENGTH_USERNAME = 150
+
+REFERENCE_CACHE_TIMEOUT = 60
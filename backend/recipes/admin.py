@@ -34,12 +34,9 @@ class RecipeAdmin(ModelAdmin):
                           "pub_date")
     search_fields = ("name",)
     list_filter = ("author", "tags")
+    list_select_related = ("author",)
     empty_value_display = "-пусто-"
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
-            "author").prefetch_related("tags", "ingredients")
-
 
 @register(Tag)
 class TagAdmin(ModelAdmin):
@@ -77,13 +74,9 @@ class RecipeIngredientsAdmin(ModelAdmin):
     list_display = ("id", "recipe", "ingredient", "amount")
     list_display_links = ("id", "recipe", "ingredient", "amount")
     list_filter = ("recipe", "ingredient")
+    list_select_related = ("recipe", "ingredient")
     empty_value_display = "-пусто-"
 
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        return queryset.select_related(
-            "recipe").select_related("ingredient")
-
 
 @register(Favorite)
 class FavoriteAdmin(ModelAdmin):
@@ -92,13 +85,9 @@ class FavoriteAdmin(ModelAdmin):
     list_display = ("id", "user", "recipe")
     list_display_links = ("id", "user", "recipe")
     list_filter = ("user", "recipe")
+    list_select_related = ("user", "recipe")
     empty_value_display = "-пусто-"
 
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        return queryset.select_related(
-            "user").select_related("recipe")
-
 
 @register(ShoppingCart)
 class ShoppingCartAdmin(ModelAdmin):
@@ -107,9 +96,5 @@ class ShoppingCartAdmin(ModelAdmin):
     list_display = ("id", "user", "recipe")
     list_display_links = ("id", "user", "recipe")
     list_filter = ("user", "recipe")
+    list_select_related = ("user", "recipe")
     empty_value_display = "-пусто-"
-
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        return queryset.select_related(
-            "user").select_related("recipe")
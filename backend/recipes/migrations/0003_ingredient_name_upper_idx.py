@@ -0,0 +1,20 @@
+# Generated by Django 3.2.3 on 2026-10-15 22:15
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX "ingredient_name_upper_idx" '
+                'ON "recipes_ingredient" (UPPER("name") varchar_pattern_ops);'
+            ),
+            reverse_sql='DROP INDEX "ingredient_name_upper_idx";',
+        ),
+    ]
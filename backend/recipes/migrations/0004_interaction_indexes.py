@@ -0,0 +1,49 @@
+# Generated by Django 3.2.3 on 2026-10-15 22:18
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_interactions(apps, schema_editor):
+    """Оставляет по одной записи с наименьшим id на пару (user, recipe)."""
+    for model_name in ("Favorite", "ShoppingCart"):
+        model = apps.get_model("recipes", model_name)
+        duplicates = (
+            model.objects.values("user", "recipe")
+            .annotate(min_id=Min("id"), count=Count("id"))
+            .filter(count__gt=1)
+            .order_by()
+        )
+        for duplicate in duplicates:
+            model.objects.filter(
+                user=duplicate["user"], recipe=duplicate["recipe"]
+            ).exclude(id=duplicate["min_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_ingredient_name_upper_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_duplicate_interactions, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['recipe', 'user'], name='favorite_recipe_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppingcart',
+            index=models.Index(fields=['recipe', 'user'], name='shoppingcart_recipe_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='favorite_unique_interaction'),
+        ),
+        migrations.AddConstraint(
+            model_name='shoppingcart',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='shoppingcart_unique_interaction'),
+        ),
+    ]
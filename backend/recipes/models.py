@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.core.validators import MinValueValidator, RegexValidator
 from django.db.models import (CASCADE, CharField, DateTimeField, ForeignKey,
-                              ImageField, ManyToManyField, Model,
+                              ImageField, Index, ManyToManyField, Model,
                               PositiveSmallIntegerField, SlugField, TextField,
                               UniqueConstraint)
 
@@ -147,6 +147,21 @@ class RecipeIngredients(Model):
     def __str__(self):
         return f"{self.ingredient} – {self.amount}"
 
+    @classmethod
+    def bulk_create_for(cls, recipe, items, batch_size=500):
+        """Создает состав рецепта одним INSERT на каждые batch_size строк."""
+        return cls.objects.bulk_create(
+            (
+                cls(
+                    recipe=recipe,
+                    ingredient=item["id"],
+                    amount=item["amount"],
+                )
+                for item in items
+            ),
+            batch_size=batch_size,
+        )
+
 
 class BaseInteractionModel(Model):
     """Базовая абстрактная модель для избранного и корзины."""
@@ -166,7 +181,13 @@ class BaseInteractionModel(Model):
         abstract = True
         constraints = [
             UniqueConstraint(
-                fields=["user", "recipe"], name="unique_interaction"
+                fields=["user", "recipe"],
+                name="%(class)s_unique_interaction",
+            )
+        ]
+        indexes = [
+            Index(
+                fields=["recipe", "user"], name="%(class)s_recipe_user_idx"
             )
         ]
 
@@ -177,7 +198,7 @@ class BaseInteractionModel(Model):
 class Favorite(BaseInteractionModel):
     """Модель избранного рецепта."""
 
-    class Meta:
+    class Meta(BaseInteractionModel.Meta):
         verbose_name = "Избранный рецепт"
         verbose_name_plural = "Избранные рецепты"
 
@@ -185,6 +206,6 @@ class Favorite(BaseInteractionModel):
 class ShoppingCart(BaseInteractionModel):
     """Модель корзины."""
 
-    class Meta:
+    class Meta(BaseInteractionModel.Meta):
         verbose_name = "Корзина покупок"
         verbose_name_plural = "Корзины покупок"
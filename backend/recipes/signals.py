@@ -0,0 +1,12 @@
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.models import Ingredient, Tag
+
+
+@receiver([post_save, post_delete], sender=Tag)
+@receiver([post_save, post_delete], sender=Ingredient)
+def clear_reference_cache(**kwargs):
+    """Сброс закешированных ответов со списками тегов и ингредиентов."""
+    caches["reference"].clear()
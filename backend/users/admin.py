@@ -30,9 +30,6 @@ class SubscriptionAdmin(ModelAdmin):
     list_display = ("id", "user", "author")
     list_display_links = ("id", "user", "author")
     list_filter = ("user", "author")
+    list_select_related = ("user", "author")
+    ordering = ("-id",)
     empty_value_display = "-пусто-"
-
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        return queryset.select_related(
-            "user").select_related("author")
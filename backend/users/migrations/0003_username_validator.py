@@ -0,0 +1,19 @@
+# Generated by Django 3.2.3 on 2026-10-15 22:24
+
+from django.db import migrations, models
+import users.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_subscription_author_user_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='username',
+            field=models.CharField(max_length=150, unique=True, validators=[users.validators.validate_username], verbose_name='Логин'),
+        ),
+    ]
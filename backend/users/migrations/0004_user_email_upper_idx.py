@@ -0,0 +1,37 @@
+# Generated by Django 3.2.3 on 2026-10-15 22:26
+
+from django.db import migrations, models
+import django.db.models.functions.text
+import users.models
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    """Приводит существующие email к нижнему регистру.
+
+    Адреса, отличающиеся только регистром, нарушат уникальность
+    и остановят миграцию до ручного разбора.
+    """
+    User = apps.get_model("users", "User")
+    User.objects.exclude(email=Lower("email")).update(email=Lower("email"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_username_validator'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.CustomUserManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='user_email_upper_idx'),
+        ),
+    ]
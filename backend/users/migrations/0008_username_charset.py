@@ -0,0 +1,17 @@
+# Generated by Django 3.2.3 on 2026-10-15 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_password_default'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.CheckConstraint(check=models.Q(('username__regex', '\\A[\\w.@+-]+\\Z'), models.Q(('username__iexact', 'me'), _negated=True)), name='username_charset'),
+        ),
+    ]
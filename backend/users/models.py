@@ -1,7 +1,18 @@
 from django.conf import settings
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db.models import (CASCADE, CharField, CheckConstraint, EmailField,
-                              F, ForeignKey, Model, Q, UniqueConstraint)
+                              F, ForeignKey, Index, Manager, Model, Q,
+                              QuerySet, UniqueConstraint)
+from django.db.models.functions import Upper
+
+from users.validators import validate_username
+
+
+class CustomUserManager(UserManager):
+    """Менеджер пользователей с поиском по email без учета регистра."""
+
+    def get_by_natural_key(self, username):
+        return self.get(**{f"{self.model.USERNAME_FIELD}__iexact": username})
 
 
 class User(AbstractUser):
@@ -16,6 +27,7 @@ class User(AbstractUser):
         verbose_name="Логин",
         max_length=settings.MAX_LENGTH_USERNAME,
         unique=True,
+        validators=[validate_username],
     )
     first_name = CharField(
         verbose_name="Имя",
@@ -25,21 +37,53 @@ class User(AbstractUser):
         verbose_name="Фамилия",
         max_length=settings.MAX_LENGTH_USERNAME,
     )
-    password = CharField(
-        verbose_name="Пароль", max_length=settings.MAX_LENGTH_USERNAME
-    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "password", "first_name", "last_name"]
 
+    objects = CustomUserManager()
+
     class Meta:
-        ordering = ["id"]
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
+        constraints = [
+            CheckConstraint(
+                check=Q(username__regex=r"\A[\w.@+-]+\Z")
+                & ~Q(username__iexact="me"),
+                name="username_charset",
+            ),
+        ]
+        indexes = [Index(Upper("email"), name="user_email_upper_idx")]
 
     def __str__(self):
         return self.username
 
+    def save(self, *args, **kwargs):
+        self.email = self.email.lower()
+        self.username = self.username.strip()
+        super().save(*args, **kwargs)
+
+
+class SubscriptionQuerySet(QuerySet):
+    """Выборка подписок."""
+
+    def with_user_data(self):
+        """Подписки вместе с подписчиком и автором одним JOIN-запросом."""
+        return self.select_related("user", "author")
+
+    def is_following(self, user_id, author_id):
+        """Подписан ли пользователь на автора: SELECT 1 ... LIMIT 1."""
+        return self.filter(
+            user_id=user_id, author_id=author_id
+        ).order_by().exists()
+
+
+class SubscriptionManager(Manager.from_queryset(SubscriptionQuerySet)):
+    """Менеджер подписок, сразу присоединяющий подписчика и автора."""
+
+    def get_queryset(self):
+        return super().get_queryset().with_user_data()
+
 
 class Subscription(Model):
     """Модель подписки пользователей."""
@@ -54,8 +98,9 @@ class Subscription(Model):
         User, on_delete=CASCADE, related_name="following", verbose_name="Автор"
     )
 
+    objects = SubscriptionManager()
+
     class Meta:
-        ordering = ["-id"]
         verbose_name = "Подписка"
         verbose_name_plural = "Подписки"
 
@@ -68,6 +113,12 @@ class Subscription(Model):
                 name="Restriction_subscription_yourself",
             ),
         ]
+        indexes = [
+            Index(
+                fields=["author", "user"],
+                name="subscription_author_user_idx",
+            )
+        ]
 
     def __str__(self) -> str:
         return f"Подписка {self.user.username} на {self.author.username}."
@@ -0,0 +1,27 @@
+from django.core.exceptions import ValidationError
+
+FORBIDDEN_USERNAMES = frozenset({"me"})
+FORBIDDEN_USERNAME_LENGTHS = frozenset(map(len, FORBIDDEN_USERNAMES))
+USERNAME_SYMBOLS = str.maketrans("", "", "_.@+-")
+FORBIDDEN_USERNAME_MESSAGE = 'Имя пользователя "me" недопустимо.'
+USERNAME_CHARSET_MESSAGE = (
+    "Имя пользователя должно содержать только буквы, цифры "
+    "и следующие символы: @, ., +, -, _."
+)
+
+
+def validate_username(value):
+    r"""Проверка имени пользователя: допустимые символы и запрещенные имена.
+
+    Совпадает с шаблоном ``\A[\w.@+-]+\Z``: после удаления разрешенных
+    знаков препинания остаются только буквы и цифры (``str.isalnum``
+    проверяет те же юникодные категории, что и ``\w``).
+    """
+    if (
+        len(value) in FORBIDDEN_USERNAME_LENGTHS
+        and value.lower() in FORBIDDEN_USERNAMES
+    ):
+        raise ValidationError(FORBIDDEN_USERNAME_MESSAGE)
+    letters = value.translate(USERNAME_SYMBOLS)
+    if not value or letters and not letters.isalnum():
+        raise ValidationError(USERNAME_CHARSET_MESSAGE)